@@ -1,11 +1,20 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
+import os
+import struct
 import sys
+
+try:
+    import fcntl
+except ImportError:  # non-Linux platforms
+    fcntl = None  # type: ignore[assignment]
 from collections.abc import Callable
 from typing import Any, TypeVar
 
+from bleak.backends.characteristic import BleakGATTCharacteristic
 from bleak.backends.device import BLEDevice
 from bleak.backends.scanner import AdvertisementData
 from bleak.exc import BleakDBusError, BleakError
@@ -21,6 +30,10 @@ from .models import AllpowersState
 
 BLEAK_BACKOFF_TIME = 0.25
 
+ADAPTER_LOCK_PATH = "/run/allpowers-ble-{adapter}.lock"
+ADAPTER_LOCK_TIMEOUT = 15.0
+ADAPTER_LOCK_RETRY_INTERVAL = 0.25
+
 __version__ = "0.0.0"
 
 
@@ -33,6 +46,33 @@ _LOGGER.setLevel(logging.WARN)
 
 DEFAULT_ATTEMPTS = sys.maxsize
 
+_TEMPLATE = bytes.fromhex("a56500b10101000071")
+
+
+def _build_frames() -> tuple[bytes, ...]:
+    """Precompute the command frame for every combination of outputs."""
+    frames = []
+    for key in range(8):
+        light = bool(key & 0x04)
+        ac = bool(key & 0x02)
+        dc = bool(key & 0x01)
+        flags = (0x20 if light else 0) | (0x02 if ac else 0) | (0x01 if dc else 0)
+        s = bytearray(_TEMPLATE)
+        s[7] = flags
+        # I'm sure this checksum algo isn't complete/correct,
+        # but it certainly works for all the scenarios we care about
+        s[8] = (113 - flags + (4 if ac else 0)) & 0xFF
+        frames.append(bytes(s))
+    return tuple(frames)
+
+
+# Indexed by (light_on << 2) | (ac_on << 1) | dc_on
+_FRAMES = _build_frames()
+
+# Notification frame: flag byte, battery %, then input/output/minutes
+# as big-endian shorts starting at offset 7
+_FRAME = struct.Struct(">7xBBHHH")
+
 
 class CharacteristicMissingError(Exception):
     """Raised when a characteristic is missing."""
@@ -53,11 +93,21 @@ class AllpowersBLE:
         self._state = AllpowersState()
         self._connect_lock: asyncio.Lock = asyncio.Lock()
         self._client: BleakClientWithServiceCache | None = None
+        self._write_char: BleakGATTCharacteristic | None = None
+        self._notify_char: BleakGATTCharacteristic | None = None
         self._expected_disconnect = False
+        self._reconnecting = False
+        self._notify_event = asyncio.Event()
+        self._dispatch_task: asyncio.Task[None] | None = None
+        self._reconnect_task: asyncio.Task[None] | None = None
+        self._disconnect_task: asyncio.Task[None] | None = None
         self.loop = asyncio.get_running_loop()
-        self._callbacks: list[Callable[[AllpowersState], None]] = []
-        self._disconnected_callbacks: list[Callable[[], None]] = []
-        self._buf = b""
+        self._pending_outputs: dict[str, bool] = {}
+        self._flush_future: asyncio.Future[bool] | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+        self._callback_counter = itertools.count()
+        self._callbacks: dict[int, Callable[[AllpowersState], None]] = {}
+        self._disconnected_callbacks: dict[int, Callable[[], None]] = {}
 
     def set_ble_device_and_advertisement_data(
         self, ble_device: BLEDevice, advertisement_data: AdvertisementData
@@ -128,42 +178,81 @@ class AllpowersBLE:
         """Return outgoing power in watts."""
         return self._state.watts_export
 
-    async def _change_status_to_device(self) -> None:
-        """Send the current state back to the device."""
-        full = bytes.fromhex("a56500b10101000071")
-        s = bytearray(9)
-        for x in range(9):
-            s[x] = full[x]
-
-        s[7] = 0
-
-        s[7] = s[7] ^ (1 << 5) if self.light_on else s[7] & ~(1 << 5)
-        s[7] = s[7] ^ (1 << 0) if self.dc_on else s[7] & ~(1 << 0)
-        s[7] = s[7] ^ (1 << 1) if self.ac_on else s[7] & ~(1 << 1)
-
-        # I'm sure this checksum algo isn't complete/correct,
-        # but it certainly works for all the scenarios we care about
-        s[8] = 113 - s[7]
-        if self.ac_on:
-            s[8] = s[8] + 4
+    async def _change_status_to_device(
+        self, *, light: bool, ac: bool, dc: bool
+    ) -> None:
+        """Send the requested output state to the device."""
+        key = (light << 2) | (ac << 1) | dc
 
         if self._client is not None:
-            await self._client.write_gatt_char(CHARACTERISTIC_WRITE, s)
+            # Write without response, matching _execute_command_locked; the
+            # control characteristic accepts it and it saves the ATT
+            # round trip waiting for a Write Response
+            await self._client.write_gatt_char(
+                self._write_char or CHARACTERISTIC_WRITE, _FRAMES[key], response=False
+            )
 
-    async def set_torch(self, enabled: bool) -> None:
+    async def set_torch(self, enabled: bool) -> bool:
         """Set the current value of the light."""
-        self._state.light_on = enabled
-        await self._change_status_to_device()
+        return await self._set_output("light_on", enabled)
 
-    async def set_ac(self, enabled: bool) -> None:
+    async def set_ac(self, enabled: bool) -> bool:
         """Set the current value of the AC."""
-        self._state.ac_on = enabled
-        await self._change_status_to_device()
+        return await self._set_output("ac_on", enabled)
 
-    async def set_dc(self, enabled: bool) -> None:
+    async def set_dc(self, enabled: bool) -> bool:
         """Set the current value of the DC."""
-        self._state.dc_on = enabled
-        await self._change_status_to_device()
+        return await self._set_output("dc_on", enabled)
+
+    async def _set_output(self, field: str, enabled: bool) -> bool:
+        """Record a requested output change and await the coalesced write.
+
+        Changes requested within the same event-loop tick are sent as
+        one frame. The requested values are kept apart from self._state
+        so a notification arriving before the flush cannot overwrite
+        the command, and the caller awaits the shared flush so write
+        errors and the disconnected case surface to it.
+        """
+        pending = self._pending_outputs
+        if pending.get(field, getattr(self._state, field)) == enabled:
+            if field in pending and self._flush_future is not None:
+                return await self._flush_future
+            return True
+        pending[field] = enabled
+        if self._flush_future is None:
+            self._flush_future = self.loop.create_future()
+            # Keep a reference so the task is not garbage collected mid-flight
+            self._flush_task = self.loop.create_task(self._flush_write())
+        return await self._flush_future
+
+    async def _flush_write(self) -> None:
+        """Send the pending output changes with a single write."""
+        future = self._flush_future
+        pending = self._pending_outputs
+        self._flush_future = None
+        self._pending_outputs = {}
+
+        state = self._state
+        light = pending.get("light_on", state.light_on)
+        ac = pending.get("ac_on", state.ac_on)
+        dc = pending.get("dc_on", state.dc_on)
+        try:
+            if self._client is None or not self._client.is_connected:
+                # Not connected; report failure rather than silently
+                # dropping the command
+                result = False
+            else:
+                await self._change_status_to_device(light=light, ac=ac, dc=dc)
+                state.light_on = light
+                state.ac_on = ac
+                state.dc_on = dc
+                result = True
+        except Exception as ex:  # pylint: disable=broad-except
+            if future is not None and not future.done():
+                future.set_exception(ex)
+            return
+        if future is not None and not future.done():
+            future.set_result(result)
 
     async def stop(self) -> None:
         """Stop the Allpowers BLE."""
@@ -172,35 +261,36 @@ class AllpowersBLE:
 
     def _fire_callbacks(self) -> None:
         """Fire the callbacks."""
-        for callback in self._callbacks:
-            callback(self._state)
+        state = self._state
+        for callback in tuple(self._callbacks.values()):
+            try:
+                callback(state)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("%s: state callback failed", self.name)
 
     def register_callback(
         self, callback: Callable[[AllpowersState], None]
     ) -> Callable[[], None]:
         """Register a callback to be called when the state changes."""
-
-        def unregister_callback() -> None:
-            self._callbacks.remove(callback)
-
-        self._callbacks.append(callback)
-        return unregister_callback
+        token = next(self._callback_counter)
+        self._callbacks[token] = callback
+        return lambda: self._callbacks.pop(token, None)
 
     def _fire_disconnected_callbacks(self) -> None:
         """Fire the callbacks."""
-        for callback in self._disconnected_callbacks:
-            callback()
+        for callback in tuple(self._disconnected_callbacks.values()):
+            try:
+                callback()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("%s: disconnected callback failed", self.name)
 
     def register_disconnected_callback(
         self, callback: Callable[[], None]
     ) -> Callable[[], None]:
         """Register a callback to be called when the state changes."""
-
-        def unregister_callback() -> None:
-            self._disconnected_callbacks.remove(callback)
-
-        self._disconnected_callbacks.append(callback)
-        return unregister_callback
+        token = next(self._callback_counter)
+        self._disconnected_callbacks[token] = callback
+        return lambda: self._disconnected_callbacks.pop(token, None)
 
     async def initialise(self) -> None:
         """Initialize the device."""
@@ -208,9 +298,11 @@ class AllpowersBLE:
         await self._ensure_connected()
 
         # _LOGGER.debug("%s: Subscribe to notifications; RSSI: %s", self.name, self.rssi)
+        if self._dispatch_task is None or self._dispatch_task.done():
+            self._dispatch_task = self.loop.create_task(self._dispatch_loop())
         if self._client is not None:
             await self._client.start_notify(
-                CHARACTERISTIC_NOTIFY, self._notification_handler
+                self._notify_char or CHARACTERISTIC_NOTIFY, self._notification_handler
             )
 
     async def _ensure_connected(self) -> None:
@@ -229,67 +321,162 @@ class AllpowersBLE:
             if self._client and self._client.is_connected:
                 return
             _LOGGER.debug("%s: Connecting; RSSI: %s", self.name, self.rssi)
-            client = await establish_connection(
-                BleakClientWithServiceCache,
-                self._ble_device,
-                self.name,
-                self._disconnected,
-                use_services_cache=True,
-                ble_device_callback=lambda: self._ble_device,
-            )
+            lock_fd = await self._acquire_adapter_lock()
+            try:
+                client = await establish_connection(
+                    BleakClientWithServiceCache,
+                    self._ble_device,
+                    self.name,
+                    self._disconnected,
+                    use_services_cache=True,
+                    ble_device_callback=lambda: self._ble_device,
+                )
+            finally:
+                self._release_adapter_lock(lock_fd)
             _LOGGER.debug("%s: Connected; RSSI: %s", self.name, self.rssi)
 
             self._client = client
+            # Resolve the characteristics once so every write/notify call
+            # skips the UUID parse and service-tree lookup
+            self._write_char = client.services.get_characteristic(CHARACTERISTIC_WRITE)
+            self._notify_char = client.services.get_characteristic(
+                CHARACTERISTIC_NOTIFY
+            )
+
+    def _adapter_name(self) -> str:
+        """Best-effort name of the BLE adapter serving this device."""
+        details = getattr(self._ble_device, "details", None)
+        if isinstance(details, dict):
+            path = details.get("path")
+            if isinstance(path, str) and path.startswith("/org/bluez/"):
+                return path.split("/")[3]
+        return "hci0"
+
+    async def _acquire_adapter_lock(self) -> int | None:
+        """Take a cross-process lock on the adapter before connecting.
+
+        Serialises connection attempts with other processes using the
+        same adapter to avoid BlueZ InProgress retry storms. Degrades
+        gracefully: returns None (no lock held) if the lock file cannot
+        be opened or another process holds it past the timeout.
+        """
+        if fcntl is None:
+            return None
+        path = ADAPTER_LOCK_PATH.format(adapter=self._adapter_name())
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError:
+            return None
+        deadline = self.loop.time() + ADAPTER_LOCK_TIMEOUT
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except OSError:
+                if self.loop.time() >= deadline:
+                    _LOGGER.debug(
+                        "%s: Timed out waiting for adapter lock %s; "
+                        + "connecting without it",
+                        self.name,
+                        path,
+                    )
+                    os.close(fd)
+                    return None
+                await asyncio.sleep(ADAPTER_LOCK_RETRY_INTERVAL)
+
+    def _release_adapter_lock(self, fd: int | None) -> None:
+        """Release the adapter lock taken by _acquire_adapter_lock."""
+        if fd is None:
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
 
     async def _reconnect(self) -> None:
-        """Attempt a reconnect."""
-        _LOGGER.debug("ensuring connection")
+        """Attempt a reconnect with exponential backoff."""
+        if self._reconnecting:
+            return
+        self._reconnecting = True
         try:
-            await self._ensure_connected()
-            _LOGGER.debug("ensured connection - initialising")
-            await self.initialise()
-        except BleakNotFoundError:
-            _LOGGER.debug("failed to ensure connection - backing off")
-            await asyncio.sleep(BLEAK_BACKOFF_TIME)
-            _LOGGER.debug("reconnecting again")
-            _dummy = asyncio.create_task(self._reconnect())
+            backoff = BLEAK_BACKOFF_TIME
+            while True:
+                try:
+                    _LOGGER.debug("ensuring connection")
+                    await self._ensure_connected()
+                    _LOGGER.debug("ensured connection - initialising")
+                    await self.initialise()
+                    return
+                except BleakNotFoundError:
+                    _LOGGER.debug(
+                        "failed to ensure connection - backing off %ss", backoff
+                    )
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 30)
+        finally:
+            self._reconnecting = False
 
     def _notification_handler(self, _sender: int, data: bytearray) -> None:
         """Handle notification responses."""
-        _LOGGER.debug("%s: Notification received: %s", self.name, data.hex())
-
-        self._buf += data
+        debug_enabled = _LOGGER.isEnabledFor(logging.DEBUG)
+        if debug_enabled:
+            _LOGGER.debug("%s: Notification received: %s", self.name, data.hex())
 
         if len(data) <= 14: return
 
-        battery_percentage = data[8]
-        dc_on = data[7] >> 0 & 1 == 1
-        ac_on = data[7] >> 1 & 1 == 1
-        torch_on = data[7] >> 4 & 1 == 1
-        output_power = (256 * data[11]) + data[12]
-        input_power = (256 * data[9]) + data[10]
-        minutes_remaining = (256 * data[13]) + data[14]
-
-        self._state = AllpowersState(
-            ac_on=ac_on,
-            dc_on=dc_on,
-            light_on=torch_on,
-            percent_remain=battery_percentage,
-            minutes_remain=minutes_remaining,
-            watts_export=output_power,
-            watts_import=input_power,
+        flags, battery_percentage, input_power, output_power, minutes_remaining = (
+            _FRAME.unpack_from(data)
         )
 
-        self._fire_callbacks()
-
-        _LOGGER.debug(
-            "%s: Notification received; RSSI: %s: %s %s",
-            self.name,
-            self.rssi,
-            data.hex(),
-            self._state,
+        # Bleak backends may deliver notifications on a non-asyncio
+        # thread - the same premise _disconnected defends against - so
+        # mutate the state and wake the dispatch loop on the event loop
+        self.loop.call_soon_threadsafe(
+            self._apply_notification,
+            flags,
+            battery_percentage,
+            input_power,
+            output_power,
+            minutes_remaining,
         )
 
+    def _apply_notification(
+        self,
+        flags: int,
+        battery_percentage: int,
+        input_power: int,
+        output_power: int,
+        minutes_remaining: int,
+    ) -> None:
+        """Apply a parsed notification to the state on the event loop."""
+        state = self._state
+        state.ac_on = bool(flags & 0x02)
+        state.dc_on = bool(flags & 0x01)
+        state.light_on = bool(flags & 0x10)
+        state.percent_remain = battery_percentage
+        state.minutes_remain = minutes_remaining
+        state.watts_export = output_power
+        state.watts_import = input_power
+
+        # Wake the dispatch loop rather than firing callbacks inline;
+        # notifications arriving before it runs conflate to the latest state
+        self._notify_event.set()
+
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "%s: Notification applied; RSSI: %s: %s",
+                self.name,
+                self.rssi,
+                state,
+            )
+
+    async def _dispatch_loop(self) -> None:
+        """Fire callbacks with the latest state as notifications arrive."""
+        while True:
+            await self._notify_event.wait()
+            self._notify_event.clear()
+            self._fire_callbacks()
+
     def _disconnected(self, client: BleakClientWithServiceCache) -> None:
         """Disconnected callback."""
         self._fire_disconnected_callbacks()
@@ -303,11 +490,24 @@ class AllpowersBLE:
             self.name,
             self.rssi,
         )
-        _dummy = asyncio.create_task(self._reconnect())
+        # May be called from a non-asyncio bleak backend thread, so the
+        # task must be created on the loop; keep a reference so it is
+        # not garbage collected mid-flight
+        self.loop.call_soon_threadsafe(self._create_reconnect_task)
+
+    def _create_reconnect_task(self) -> None:
+        """Create the reconnect task on the event loop."""
+        self._reconnect_task = self.loop.create_task(self._reconnect())
 
     def _disconnect(self) -> None:
         """Disconnect from device."""
-        _dummy = asyncio.create_task(self._execute_timed_disconnect())
+        self.loop.call_soon_threadsafe(self._create_disconnect_task)
+
+    def _create_disconnect_task(self) -> None:
+        """Create the disconnect task on the event loop."""
+        self._disconnect_task = self.loop.create_task(
+            self._execute_timed_disconnect()
+        )
 
     async def _execute_timed_disconnect(self) -> None:
         """Execute timed disconnection."""
@@ -319,16 +519,24 @@ class AllpowersBLE:
 
     async def _execute_disconnect(self) -> None:
         """Execute disconnection."""
+        if self._dispatch_task is not None:
+            self._dispatch_task.cancel()
+            self._dispatch_task = None
         async with self._connect_lock:
             client = self._client
+            notify_char = self._notify_char
             self._expected_disconnect = True
             self._client = None
+            self._write_char = None
+            self._notify_char = None
             if client and client.is_connected:
-                await client.stop_notify(CHARACTERISTIC_NOTIFY)
+                await client.stop_notify(notify_char or CHARACTERISTIC_NOTIFY)
                 await client.disconnect()
 
     @retry_bluetooth_connection_error(DEFAULT_ATTEMPTS)
-    async def _send_command_locked(self, commands: list[bytes]) -> None:
+    async def _send_command_locked(
+        self, commands: list[bytes] | tuple[bytes, ...]
+    ) -> None:
         """Send command to device and read response."""
         try:
             await self._execute_command_locked(commands)
@@ -353,23 +561,24 @@ class AllpowersBLE:
             raise
 
     async def _send_command(
-        self, commands: list[bytes] | bytes, retry: int | None = None
+        self, commands: list[bytes] | tuple[bytes, ...] | bytes, retry: int | None = None
     ) -> None:
         """Send command to device and read response."""
         await self._ensure_connected()
-        if not isinstance(commands, list):
-            commands = [commands]
+        if not isinstance(commands, (list, tuple)):
+            commands = (commands,)
         await self._send_command_while_connected(commands, retry)
 
     async def _send_command_while_connected(
-        self, commands: list[bytes], retry: int | None = None
+        self, commands: list[bytes] | tuple[bytes, ...], retry: int | None = None
     ) -> None:
         """Send command to device and read response."""
-        _LOGGER.debug(
-            "%s: Sending commands %s",
-            self.name,
-            [command.hex() for command in commands],
-        )
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "%s: Sending commands %s",
+                self.name,
+                [command.hex() for command in commands],
+            )
         if self._operation_lock.locked():
             _LOGGER.debug(
                 "%s: Operation already in progress,"
@@ -404,8 +613,11 @@ class AllpowersBLE:
 
         raise RuntimeError("Unreachable")
 
-    async def _execute_command_locked(self, commands: list[bytes]) -> None:
+    async def _execute_command_locked(
+        self, commands: list[bytes] | tuple[bytes, ...]
+    ) -> None:
         """Execute command and read response."""
         if self._client is not None:
+            write_char = self._write_char or CHARACTERISTIC_WRITE
             for command in commands:
-                await self._client.write_gatt_char(CHARACTERISTIC_WRITE, command, False)
+                await self._client.write_gatt_char(write_char, command, False)
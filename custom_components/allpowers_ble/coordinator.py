@@ -22,13 +22,23 @@ class AllpowersBLECoordinator(DataUpdateCoordinator[None]):
         allpowers_ble.register_callback(self._async_handle_update)
         allpowers_ble.register_disconnected_callback(self._async_handle_disconnect)
         self.connected = True
+        self._pending = False
 
     @callback
     def _async_handle_update(self, state: AllpowersState) -> None:
-        """Just trigger the callbacks."""
+        """Coalesce updates arriving within one event-loop tick."""
         # _LOGGER.warning("_async_handle_update")
         self.connected = True
         # _LOGGER.info("state", state)
+        if self._pending:
+            return
+        self._pending = True
+        self.hass.loop.call_soon(self._flush)
+
+    @callback
+    def _flush(self) -> None:
+        """Dispatch one update for all notifications received this tick."""
+        self._pending = False
         self.async_set_updated_data(None)
 
     @callback
@@ -8,7 +8,7 @@ if TYPE_CHECKING:
     from .coordinator import AllpowersBLECoordinator
 
 
-@dataclass
+@dataclass(slots=True)
 class AllpowersBLEData:
     """Data for Allpowers BLE battery integration."""
 
@@ -17,7 +17,7 @@ class AllpowersBLEData:
     coordinator: AllpowersBLECoordinator
 
 
-@dataclass(frozen=False)
+@dataclass(frozen=False, slots=True)
 class AllpowersState:
     """State model for Allpowers devices."""
 
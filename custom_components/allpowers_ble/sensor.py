@@ -104,6 +104,7 @@ class AllpowersBLESensor(
         self._coordinator = coordinator
         self._device = device
         self._key = description.key
+        self._last_emitted: tuple[str | int | None, bool] | None = None
         self.entity_description = description
         self._attr_unique_id = f"{device.address}_{self._key}"
         self._attr_device_info = DeviceInfo(
@@ -120,7 +121,13 @@ class AllpowersBLESensor(
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator"""
-        self._attr_native_value = getattr(self._device, self._key)
+        # Track the connected flag too; assumed_state depends on it, so
+        # a disconnect must be emitted even when the reading is unchanged
+        emitted = (getattr(self._device, self._key), self._coordinator.connected)
+        if emitted == self._last_emitted:
+            return
+        self._last_emitted = emitted
+        self._attr_native_value = emitted[0]
         self.async_write_ha_state()
 
     @property
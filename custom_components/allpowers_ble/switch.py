@@ -16,8 +16,16 @@ from . import AllpowersBLE, AllpowersBLECoordinator
 from .const import DOMAIN
 from .models import AllpowersBLEData
 
+import operator
 from typing import Dict, Any
 
+_SETTERS = {"ac": "set_ac", "dc": "set_dc", "torch": "set_torch"}
+_GETTERS = {
+    "ac": operator.attrgetter("ac_on"),
+    "dc": operator.attrgetter("dc_on"),
+    "torch": operator.attrgetter("light_on"),
+}
+
 AC_SWITCH_DESCRIPTION = SwitchEntityDescription(
     key="ac",
     device_class=SwitchDeviceClass.OUTLET,
@@ -88,7 +96,10 @@ class AllpowersBLESwitch(
         self._device = device
         self._attr_is_on = False
         self._last_action = None
+        self._last_emitted_is_on: bool | None = None
         self._key = description.key
+        self._setter = getattr(device, _SETTERS.get(self._key, ""), None)
+        self._getter = _GETTERS.get(self._key)
         self.entity_description = description
         self._attr_unique_id = f"{device.address}_{self._key}"
         self._attr_device_info = DeviceInfo(
@@ -108,11 +119,9 @@ class AllpowersBLESwitch(
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn entity off"""
-        if self._key not in ["ac", "dc", "torch"]:
+        if self._setter is None:
             return
-        self._last_run_success = bool(
-            await getattr(self._device, f"set_{self._key}")(False)
-        )
+        self._last_run_success = bool(await self._setter(False))
         if self._last_run_success:
             self._attr_is_on = False
             self._last_action = "Off"
@@ -120,11 +129,9 @@ class AllpowersBLESwitch(
 
     async def async_turn_on(self, **kwargs) -> None:
         """Turn entity off"""
-        if self._key not in ["ac", "dc", "torch"]:
+        if self._setter is None:
             return
-        self._last_run_success = bool(
-            await getattr(self._device, f"set_{self._key}")(True)
-        )
+        self._last_run_success = bool(await self._setter(True))
         if self._last_run_success:
             self._attr_is_on = False
             self._last_action = "On"
@@ -133,6 +140,10 @@ class AllpowersBLESwitch(
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator"""
+        cur = self.is_on
+        if cur == self._last_emitted_is_on:
+            return
+        self._last_emitted_is_on = cur
         self.async_write_ha_state()
 
     @property
@@ -143,14 +154,9 @@ class AllpowersBLESwitch(
     @property
     def is_on(self) -> bool | None:
         """Return true if device is on"""
-        if self._key == "ac":
-            return self._device.ac_on
-        elif self._key == "dc":
-            return self._device.dc_on
-        elif self._key == "torch":
-            return self._device.light_on
-        else:
+        if self._getter is None:
             return False
+        return self._getter(self._device)
 
     @property
     def assumed_state(self) -> bool: